@@ -11,6 +11,10 @@ import json
 from datetime import datetime
 import threading
 import math
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # --- Dependency Check ---
 try:
@@ -24,6 +28,61 @@ DEFAULT_TARGET_BASE_DIR = r"F:\AppData"
 IS_WINDOWS = platform.system() == "Windows"
 LOG_FILE_NAME = "linker_log.json"
 CONFIG_FILE_NAME = "linker_config.json"
+COPY_WORKERS = min(8, (os.cpu_count() or 4) * 2)
+IO_CHUNK_SIZE = 1024 * 1024
+PENDING_CHECK_INTERVAL_MS = 30 * 1000
+
+# --- I/O 限速 ---
+class TokenBucket:
+    def __init__(self, rate=0):
+        self._lock = threading.Lock()
+        self.rate = 0
+        self.tokens = 0
+        self.last_time = time.monotonic()
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        with self._lock:
+            self._refill()
+            if self.rate <= 0: self.tokens = rate
+            self.rate = rate
+            self.tokens = min(self.tokens, rate)
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate > 0:
+            self.tokens = min(self.rate, self.tokens + (now - self.last_time) * self.rate)
+        self.last_time = now
+
+    def consume(self, amount):
+        # 先预扣令牌，再等待欠额被补齐；每次最多睡眠 0.2 秒以便及时响应速率调整
+        with self._lock:
+            if self.rate <= 0: return
+            self._refill()
+            self.tokens -= amount
+        while True:
+            with self._lock:
+                if self.rate <= 0: return
+                self._refill()
+                if self.tokens >= 0: return
+                wait = min(-self.tokens / self.rate, 0.2)
+            time.sleep(wait)
+
+class IOThrottle:
+    def __init__(self):
+        self.bandwidth = TokenBucket()
+        self.iops = TokenBucket()
+
+    def set_limits(self, mb_per_sec, iops):
+        self.bandwidth.set_rate(mb_per_sec * 1024 * 1024)
+        self.iops.set_rate(iops)
+
+    def is_limited(self):
+        return self.bandwidth.rate > 0 or self.iops.rate > 0
+
+    def consume(self, nbytes=0, ops=1):
+        if ops: self.iops.consume(ops)
+        if nbytes: self.bandwidth.consume(nbytes)
 
 # --- GUI 类 ---
 class FolderLinkerTkinterApp(TkinterDnD.Tk if DND_SUPPORT else tk.Tk):
@@ -42,12 +101,23 @@ class FolderLinkerTkinterApp(TkinterDnD.Tk if DND_SUPPORT else tk.Tk):
         self.log_file = LOG_FILE_NAME
         self.config_file = CONFIG_FILE_NAME
         self.linked_items = {}
+        self.target_index = None
         self.custom_protected_paths = []
         self.is_admin_user = self.check_admin()
         self.mode_var = tk.StringVar(value="link")
+        self.last_mode = "link"
         self.target_base_dir = tk.StringVar(value=DEFAULT_TARGET_BASE_DIR)
         self.target_dir_ok = False
         self.scan_thread = None
+        self.io_throttle = IOThrottle()
+        self.io_limit_mb_per_sec = 0
+        self.io_limit_iops = 0
+        self.low_priority_workers = False
+        self.off_peak_enabled = False
+        self.off_peak_start = "01:00"
+        self.off_peak_end = "07:00"
+        self.pending_batches = []
+        self.batch_running = False
 
         # --- 构建UI元素 ---
         self.paned_window = ttk.PanedWindow(self, orient=tk.VERTICAL)
@@ -79,6 +149,9 @@ class FolderLinkerTkinterApp(TkinterDnD.Tk if DND_SUPPORT else tk.Tk):
         style = ttk.Style(self)
         style.configure('Accent.TButton', font=('Segoe UI', 10, 'bold'), padding=6)
 
+        self.after(PENDING_CHECK_INTERVAL_MS, self._check_pending_batches)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
         # --- Deferred error showing ---
         if self.initialization_error:
             self.after(100, self.show_initialization_error)
@@ -101,6 +174,9 @@ class FolderLinkerTkinterApp(TkinterDnD.Tk if DND_SUPPORT else tk.Tk):
         self.edit_protected_button = ttk.Button(config_frame, text="编辑保护列表...", command=self.open_protected_paths_editor)
         self.edit_protected_button.grid(row=0, column=3, padx=(10, 0), sticky=tk.E)
 
+        self.performance_button = ttk.Button(config_frame, text="性能设置...", command=self.open_performance_settings)
+        self.performance_button.grid(row=0, column=4, padx=(5, 0), sticky=tk.E)
+
         config_frame.columnconfigure(1, weight=1)
 
     def create_main_controls_widgets(self, parent):
@@ -114,8 +190,10 @@ class FolderLinkerTkinterApp(TkinterDnD.Tk if DND_SUPPORT else tk.Tk):
         mode_frame.pack(fill=tk.X)
         self.link_radio = ttk.Radiobutton(mode_frame, text="创建链接", variable=self.mode_var, value="link", command=self.on_mode_change)
         self.restore_radio = ttk.Radiobutton(mode_frame, text="还原链接", variable=self.mode_var, value="restore", command=self.on_mode_change)
+        self.relocate_radio = ttk.Radiobutton(mode_frame, text="迁移链接", variable=self.mode_var, value="relocate", command=self.on_mode_change)
         self.link_radio.pack(side=tk.LEFT, padx=5)
         self.restore_radio.pack(side=tk.LEFT, padx=5)
+        self.relocate_radio.pack(side=tk.LEFT, padx=5)
 
         list_frame = ttk.LabelFrame(left_frame, text="待处理文件夹列表", padding="5")
         list_frame.pack(fill=tk.BOTH, expand=True, pady=(5,0))
@@ -142,6 +220,10 @@ class FolderLinkerTkinterApp(TkinterDnD.Tk if DND_SUPPORT else tk.Tk):
         right_frame.pack(side=tk.RIGHT, fill=tk.Y)
         self.execute_button = ttk.Button(right_frame, text="执行批量操作", command=self.execute_batch, style='Accent.TButton')
         self.execute_button.pack(expand=True, fill=tk.BOTH, ipadx=10)
+        self.manage_queue_button = ttk.Button(right_frame, text="管理队列...", command=self.manage_queue)
+        self.manage_queue_button.pack(fill=tk.X, pady=(5, 0))
+        self.queue_status_label = ttk.Label(right_frame, text="", anchor=tk.CENTER)
+        self.queue_status_label.pack(fill=tk.X)
 
     def create_scanner_widgets(self, parent):
         tree_frame = ttk.Frame(parent)
@@ -216,6 +298,13 @@ class FolderLinkerTkinterApp(TkinterDnD.Tk if DND_SUPPORT else tk.Tk):
                     self.custom_protected_paths = config.get("custom_protected_paths", [])
                     default_dir = self.target_base_dir.get()
                     self.target_base_dir.set(config.get("target_base_dir", default_dir))
+                    self.io_limit_mb_per_sec = config.get("io_limit_mb_per_sec", 0)
+                    self.io_limit_iops = config.get("io_limit_iops", 0)
+                    self.low_priority_workers = config.get("low_priority_workers", False)
+                    self.off_peak_enabled = config.get("off_peak_enabled", False)
+                    self.off_peak_start = config.get("off_peak_start", self.off_peak_start)
+                    self.off_peak_end = config.get("off_peak_end", self.off_peak_end)
+                    self.io_throttle.set_limits(self.io_limit_mb_per_sec, self.io_limit_iops)
             else:
                 self._save_config()
         except (json.JSONDecodeError, IOError) as e:
@@ -224,7 +313,13 @@ class FolderLinkerTkinterApp(TkinterDnD.Tk if DND_SUPPORT else tk.Tk):
     def _save_config(self):
         config = {
             "target_base_dir": self.target_base_dir.get(),
-            "custom_protected_paths": self.custom_protected_paths
+            "custom_protected_paths": self.custom_protected_paths,
+            "io_limit_mb_per_sec": self.io_limit_mb_per_sec,
+            "io_limit_iops": self.io_limit_iops,
+            "low_priority_workers": self.low_priority_workers,
+            "off_peak_enabled": self.off_peak_enabled,
+            "off_peak_start": self.off_peak_start,
+            "off_peak_end": self.off_peak_end
         }
         try:
             with open(self.config_file, 'w', encoding='utf-8') as f:
@@ -254,11 +349,13 @@ class FolderLinkerTkinterApp(TkinterDnD.Tk if DND_SUPPORT else tk.Tk):
     def _add_log_entry(self, source_path, target_path):
         entry = {"target": target_path, "timestamp": datetime.now().isoformat()}
         self.linked_items[source_path] = entry
+        self.target_index = None
         self._write_log()
 
     def _remove_log_entry(self, source_path):
         if source_path in self.linked_items:
             del self.linked_items[source_path]
+            self.target_index = None
             self._write_log()
 
     def check_admin(self):
@@ -298,7 +395,7 @@ class FolderLinkerTkinterApp(TkinterDnD.Tk if DND_SUPPORT else tk.Tk):
 
         try:
             self.log(f"1. 正在复制文件夹到 '{target_data_path}' ...", "info")
-            shutil.copytree(source_path, target_data_path, symlinks=True, ignore_dangling_symlinks=True)
+            shutil.copytree(source_path, target_data_path, symlinks=True, ignore_dangling_symlinks=True, copy_function=self._copy_file)
         except Exception as e:
             self.log(f"错误: 复制文件夹失败: {e}", "error")
             if os.path.exists(target_data_path): shutil.rmtree(target_data_path, ignore_errors=True)
@@ -314,10 +411,7 @@ class FolderLinkerTkinterApp(TkinterDnD.Tk if DND_SUPPORT else tk.Tk):
 
         try:
             self.log("3. 正在创建符号链接...", "info")
-            if IS_WINDOWS:
-                subprocess.run(f'mklink /D "{link_path}" "{target_data_path}"', check=True, capture_output=True, text=True, encoding='gbk', shell=True)
-            else:
-                os.symlink(target_data_path, link_path, target_is_directory=True)
+            self._create_dir_link(link_path, target_data_path)
         except Exception as e:
             self.log(f"错误: 创建符号链接失败: {e}", "error")
             self.log("!!! 关键错误：正在回滚...", "error")
@@ -331,7 +425,7 @@ class FolderLinkerTkinterApp(TkinterDnD.Tk if DND_SUPPORT else tk.Tk):
 
         try:
             self.log("4. 正在清理临时备份...", "info")
-            shutil.rmtree(source_path_temp_backup)
+            self._rmtree(source_path_temp_backup)
         except Exception as e:
             self.log(f"警告: 自动清理备份文件夹失败: {e}", "warning")
 
@@ -352,27 +446,285 @@ class FolderLinkerTkinterApp(TkinterDnD.Tk if DND_SUPPORT else tk.Tk):
         if not os.path.isdir(target_data_path):
             self.log(f"错误: 预期的数据源 '{target_data_path}' 不存在或不是目录。", "error")
             return False
+        if not self._is_link_to(link_path, target_data_path):
+            self.log(f"错误: '{link_path}' 已不是指向 '{target_data_path}' 的符号链接，为避免误操作已跳过。", "error")
+            return False
+
+        staging_path = link_path + "_tmp_restore_staging"
+        old_link_path = link_path + "_tmp_restore_link"
+        if os.path.exists(staging_path) or os.path.lexists(old_link_path):
+            self.log(f"错误: 临时暂存路径 '{staging_path}' 或 '{old_link_path}' 已存在。", "error")
+            return False
+
+        same_device = self._is_same_device(target_data_path, os.path.dirname(link_path))
+        if same_device:
+            self.log("1. 数据与链接位于同一设备，将直接重命名。", "info")
+            staging_path = target_data_path
+        else:
+            try:
+                self.log(f"1. 正在并行复制数据到暂存目录 '{staging_path}' ...", "info")
+                self._parallel_copytree(target_data_path, staging_path)
+            except Exception as e:
+                self.log(f"错误: 复制数据失败，链接保持不变: {e}", "error")
+                shutil.rmtree(staging_path, ignore_errors=True)
+                return False
 
         try:
-            self.log(f"1. 正在删除符号链接 '{link_path}' ...", "info")
-            if IS_WINDOWS: os.rmdir(link_path)
-            else: os.unlink(link_path)
+            self.log("2. 正在移开符号链接...", "info")
+            os.rename(link_path, old_link_path)
         except Exception as e:
-            self.log(f"错误: 删除符号链接失败: {e}", "error")
+            self.log(f"错误: 移开符号链接失败: {e}", "error")
+            if not same_device: shutil.rmtree(staging_path, ignore_errors=True)
             return False
 
         try:
-            self.log(f"2. 正在将数据移回 '{link_path}' ...", "info")
-            shutil.move(target_data_path, link_path)
+            self.log(f"3. 正在将数据放回 '{link_path}' ...", "info")
+            os.rename(staging_path, link_path)
         except Exception as e:
-            self.log("!!! 关键错误：链接已删除，但数据未能移回！", "error")
-            self.log(f"数据当前位于: '{target_data_path}'", "error")
+            self.log(f"错误: 放回数据失败: {e}", "error")
+            self.log("!!! 关键错误：正在回滚...", "error")
+            try:
+                os.rename(old_link_path, link_path)
+                if not same_device: shutil.rmtree(staging_path, ignore_errors=True)
+                self.log("回滚成功。", "success")
+            except Exception as ce:
+                self.log(f"!!! 严重: 自动回滚失败: {ce}", "error")
+                self.log(f"原链接当前位于: '{old_link_path}'", "error")
             return False
 
+        self.log("4. 正在清理旧链接和原数据...", "info")
+        try:
+            self._remove_dir_link(old_link_path)
+        except Exception as e:
+            if os.path.islink(old_link_path):
+                self.log(f"警告: 清理旧链接失败，请手动删除链接 '{old_link_path}': {e}", "warning")
+            else:
+                self.log(f"警告: '{old_link_path}' 不是符号链接，已保留，请检查其内容: {e}", "warning")
+        if not same_device:
+            try:
+                self._rmtree(target_data_path)
+            except Exception as e:
+                self.log(f"警告: 清理原数据失败，请手动删除 '{target_data_path}': {e}", "warning")
+
         self._remove_log_entry(link_path)
         self.log(f"--- 还原成功: {link_name} ---", "success")
         return True
 
+    def _create_dir_link(self, link_path, target_path):
+        if IS_WINDOWS:
+            subprocess.run(f'mklink /D "{link_path}" "{target_path}"', check=True, capture_output=True, text=True, encoding='gbk', shell=True)
+        else:
+            os.symlink(target_path, link_path, target_is_directory=True)
+
+    def _remove_dir_link(self, link_path):
+        if IS_WINDOWS: os.rmdir(link_path)
+        else: os.unlink(link_path)
+
+    def _is_link_to(self, link_path, target_path):
+        if not self.is_directory_symlink(link_path): return False
+        return self._normalize_path(os.path.realpath(link_path)) == self._normalize_path(os.path.realpath(target_path))
+
+    def _is_same_device(self, path_a, path_b):
+        try:
+            return os.stat(path_a).st_dev == os.stat(path_b).st_dev
+        except OSError:
+            return False
+
+    def _parallel_copytree(self, src, dst):
+        copied_dirs = []
+        futures = []
+        errors = []
+
+        def record_error(future):
+            if future.cancelled(): return
+            error = future.exception()
+            if error is not None: errors.append(error)
+
+        executor = ThreadPoolExecutor(max_workers=COPY_WORKERS, initializer=self._apply_worker_priority)
+        try:
+            pending = [(src, dst)]
+            while pending:
+                if errors: raise errors[0]
+                src_dir, dst_dir = pending.pop()
+                os.makedirs(dst_dir)
+                copied_dirs.append((src_dir, dst_dir))
+                with os.scandir(src_dir) as it:
+                    for entry in it:
+                        dst_entry = os.path.join(dst_dir, entry.name)
+                        if entry.is_symlink():
+                            os.symlink(os.readlink(entry.path), dst_entry, target_is_directory=entry.is_dir())
+                        elif entry.is_dir():
+                            pending.append((entry.path, dst_entry))
+                        else:
+                            if errors: raise errors[0]
+                            future = executor.submit(self._copy_file, entry.path, dst_entry)
+                            future.add_done_callback(record_error)
+                            futures.append(future)
+            for future in as_completed(futures):
+                future.result()
+        except BaseException:
+            # 首个失败即取消尚未开始的复制，避免整棵树复制完才回滚
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+        executor.shutdown(wait=True)
+        for src_dir, dst_dir in reversed(copied_dirs):
+            shutil.copystat(src_dir, dst_dir)
+
+    def _copy_file(self, src, dst):
+        # 未限速时走 copy2 的平台快速复制；运行中设置的限速从下一个文件开始生效
+        if not self.io_throttle.is_limited():
+            return shutil.copy2(src, dst)
+        self.io_throttle.consume()
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            while True:
+                chunk = fsrc.read(IO_CHUNK_SIZE)
+                if not chunk: break
+                self.io_throttle.consume(len(chunk))
+                fdst.write(chunk)
+        shutil.copystat(src, dst)
+        return dst
+
+    def _rmtree(self, path):
+        if not self.io_throttle.is_limited():
+            shutil.rmtree(path)
+            return
+        with os.scandir(path) as it:
+            entries = list(it)
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False) and not self.is_directory_symlink(entry.path):
+                self._rmtree(entry.path)
+            else:
+                self.io_throttle.consume()
+                if IS_WINDOWS and entry.is_dir(): os.rmdir(entry.path)
+                else: os.unlink(entry.path)
+        self.io_throttle.consume()
+        os.rmdir(path)
+
+    def _apply_worker_priority(self):
+        if not self.low_priority_workers: return
+        try:
+            if IS_WINDOWS:
+                THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+                kernel32 = ctypes.windll.kernel32
+                kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_MODE_BACKGROUND_BEGIN)
+            elif sys.platform.startswith("linux"):
+                # Linux 上 PRIO_PROCESS 配合线程 ID 只作用于当前线程，未单独设置时 I/O 优先级也随 nice 值降低
+                os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (OSError, AttributeError):
+            pass
+
+    def process_folder_relocate(self, link_path):
+        link_name = os.path.basename(link_path)
+        self.log(f"--- 开始迁移: {link_name} ---", "header")
+
+        log_entry = self.linked_items.get(link_path)
+        if not log_entry:
+            self.log(f"错误: 在日志文件中未找到 '{link_path}' 的记录。", "error")
+            return False
+
+        current_target_dir = self.target_base_dir.get()
+        old_target_path = log_entry['target']
+        new_target_path = os.path.join(current_target_dir, os.path.basename(old_target_path))
+        if self._normalize_path(old_target_path) == self._normalize_path(new_target_path):
+            self.log(f"警告: '{link_name}' 的数据已位于目标基目录中，跳过。", "warning")
+            return False
+        if not os.path.isdir(old_target_path):
+            self.log(f"错误: 预期的数据源 '{old_target_path}' 不存在或不是目录。", "error")
+            return False
+        if os.path.exists(new_target_path):
+            self.log(f"错误: 目标路径 '{new_target_path}' 已存在。", "error")
+            return False
+        if not self._is_link_to(link_path, old_target_path):
+            self.log(f"错误: '{link_path}' 已不是指向 '{old_target_path}' 的符号链接，为避免误操作已跳过。", "error")
+            return False
+
+        same_device = self._is_same_device(old_target_path, current_target_dir)
+        try:
+            if same_device:
+                self.log(f"1. 数据位于同一设备，正在重命名到 '{new_target_path}' ...", "info")
+                os.rename(old_target_path, new_target_path)
+            else:
+                self.log(f"1. 正在并行复制数据到 '{new_target_path}' ...", "info")
+                self._parallel_copytree(old_target_path, new_target_path)
+        except Exception as e:
+            self.log(f"错误: 迁移数据失败，链接保持不变: {e}", "error")
+            if not same_device: shutil.rmtree(new_target_path, ignore_errors=True)
+            return False
+
+        try:
+            self.log("2. 正在将符号链接指向新位置...", "info")
+            self._repoint_dir_link(link_path, new_target_path)
+        except Exception as e:
+            self.log(f"错误: 重新指向符号链接失败: {e}", "error")
+            self.log("!!! 关键错误：正在回滚...", "error")
+            try:
+                if same_device: os.rename(new_target_path, old_target_path)
+                else: shutil.rmtree(new_target_path)
+                self.log("回滚成功。", "success")
+            except Exception as ce:
+                self.log(f"!!! 严重: 自动回滚失败: {ce}", "error")
+                self.log(f"数据当前位于: '{new_target_path}'", "error")
+            return False
+
+        if not same_device:
+            try:
+                self.log(f"3. 正在清理原数据 '{old_target_path}' ...", "info")
+                self._rmtree(old_target_path)
+            except Exception as e:
+                self.log(f"警告: 清理原数据失败，请手动删除 '{old_target_path}': {e}", "warning")
+
+        self._add_log_entry(link_path, new_target_path)
+        self.log(f"--- 迁移成功: {link_name} ---", "success")
+        return True
+
+    def _normalize_path(self, path):
+        return os.path.normcase(os.path.normpath(path))
+
+    def _get_target_index(self):
+        # 按目标路径排序的 (目标, 链接) 列表，日志变化时才重建，前缀查询用二分定位
+        if self.target_index is None:
+            entries = sorted((self._normalize_path(entry['target']), link_path) for link_path, entry in self.linked_items.items())
+            self.target_index = ([target for target, _ in entries], [link_path for _, link_path in entries])
+        return self.target_index
+
+    def _find_links_under_targets(self, target_prefixes):
+        targets, links = self._get_target_index()
+        matches = {}
+        for prefix in target_prefixes:
+            prefix = self._normalize_path(prefix)
+            prefix_dir = prefix.rstrip(os.sep) + os.sep
+            ranges = [(bisect_left(targets, prefix), bisect_right(targets, prefix)),
+                      (bisect_left(targets, prefix_dir), bisect_left(targets, prefix_dir[:-1] + chr(ord(os.sep) + 1)))]
+            for lo, hi in ranges:
+                for i in range(lo, hi):
+                    matches[links[i]] = targets[i]
+        return sorted((target, link_path) for link_path, target in matches.items())
+
+    def _repoint_dir_link(self, link_path, new_target_path):
+        new_link_path = link_path + "_tmp_relocate_link"
+        self._create_dir_link(new_link_path, new_target_path)
+        try:
+            if IS_WINDOWS:
+                # Windows 上目录链接无法被重命名覆盖，只能两次重命名切换，链接会有毫秒级的缺失，并非原子操作
+                if not self.is_directory_symlink(link_path):
+                    raise OSError(f"'{link_path}' 不是符号链接")
+                old_link_path = link_path + "_tmp_relocate_old"
+                os.rename(link_path, old_link_path)
+                try:
+                    os.rename(new_link_path, link_path)
+                except OSError:
+                    os.rename(old_link_path, link_path)
+                    raise
+                try:
+                    self._remove_dir_link(old_link_path)
+                except OSError as e:
+                    self.log(f"警告: 清理旧链接 '{old_link_path}' 失败: {e}", "warning")
+            else:
+                os.replace(new_link_path, link_path)
+        except OSError:
+            if os.path.lexists(new_link_path): self._remove_dir_link(new_link_path)
+            raise
+
     def log(self, message, level="info"):
         if not hasattr(self, 'log_area'): return
         self.log_area.config(state=tk.NORMAL)
@@ -398,14 +750,17 @@ class FolderLinkerTkinterApp(TkinterDnD.Tk if DND_SUPPORT else tk.Tk):
 
     def on_mode_change(self):
         mode = self.mode_var.get()
-        action = "创建链接" if mode == "link" else "还原链接"
-        self.execute_button.config(text=f"执行批量【{action}】")
-        self.add_selected_to_list_button.config(state=tk.NORMAL if mode == 'link' else tk.DISABLED)
+        if mode == self.last_mode and self.list_widget.size() > 0: return
+        action = {"link": "创建链接", "restore": "还原链接", "relocate": "迁移链接"}[mode]
         if self.list_widget.size() > 0:
             if messagebox.askyesno("模式更改确认", f"切换到【{action}】模式将清空当前列表，确定吗？"):
                 self.list_widget.delete(0, tk.END)
             else:
-                self.mode_var.set("restore" if mode == "link" else "link")
+                self.mode_var.set(self.last_mode)
+                return
+        self.last_mode = mode
+        self.execute_button.config(text=f"执行批量【{action}】")
+        self.add_selected_to_list_button.config(state=tk.NORMAL if mode == 'link' else tk.DISABLED)
 
     def is_directory_symlink(self, path):
         if not IS_WINDOWS:
@@ -441,10 +796,8 @@ class FolderLinkerTkinterApp(TkinterDnD.Tk if DND_SUPPORT else tk.Tk):
         default_paths = self._get_default_protected_paths()
         return list(set(default_paths + self.custom_protected_paths))
 
-    def _validate_and_add_path(self, path):
-        path = os.path.normpath(path)
+    def _check_path(self, path, mode):
         error_msg = ""
-
         protected_paths = self.get_all_protected_paths()
         if path in protected_paths:
             error_msg = f"'{os.path.basename(path)}' 是一个受保护的系统关键目录。"
@@ -455,23 +808,30 @@ class FolderLinkerTkinterApp(TkinterDnD.Tk if DND_SUPPORT else tk.Tk):
                     break
         
         if error_msg:
-            self.log(f"添加失败: {error_msg}", "error")
-            return False
+            return error_msg, "error"
 
         if not os.path.exists(path):
             error_msg = "路径不存在。"
         else:
             is_link = self.is_directory_symlink(path)
             is_dir = os.path.isdir(path)
-            mode = self.mode_var.get()
 
             if mode == "link" and (not is_dir or is_link):
                 error_msg = "创建模式需要一个真实的、非链接的文件夹。"
             elif mode == "restore" and not is_link:
                 error_msg = "还原模式需要一个链接文件夹。"
+            elif mode == "relocate" and (not is_dir or not self._find_links_under_targets([path])):
+                error_msg = "迁移模式需要一个包含已链接数据的旧目标文件夹。"
         
         if error_msg:
-            self.log(f"添加失败: {os.path.basename(path)} - {error_msg}", "warning")
+            return f"{os.path.basename(path)} - {error_msg}", "warning"
+        return "", None
+
+    def _validate_and_add_path(self, path):
+        path = os.path.normpath(path)
+        error_msg, level = self._check_path(path, self.mode_var.get())
+        if error_msg:
+            self.log(f"添加失败: {error_msg}", level)
             return False
 
         if path not in self.list_widget.get(0, tk.END):
@@ -503,30 +863,123 @@ class FolderLinkerTkinterApp(TkinterDnD.Tk if DND_SUPPORT else tk.Tk):
             return
 
         mode = self.mode_var.get()
-        action_text = "创建链接" if mode == "link" else "还原"
+        action_text = {"link": "创建链接", "restore": "还原", "relocate": "迁移"}[mode]
         if not messagebox.askyesno("确认操作", f"确定要对列表中的 {len(items)} 个项目执行【{action_text}】操作吗？"):
             return
 
+        # 确认框打开期间 after() 回调仍会运行，队列中的批量可能已经开始，这里必须重新检查
+        if self.batch_running or self.pending_batches:
+            self._queue_batch(items, mode, action_text, "已有批量操作在执行或排队")
+            return
+        if self.off_peak_enabled and not self._in_off_peak_window():
+            self._queue_batch(items, mode, action_text, f"当前不在非高峰时段 {self.off_peak_start}-{self.off_peak_end}")
+            return
+
+        self._start_batch(items, mode, action_text)
+
+    def _queue_batch(self, items, mode, action_text, reason):
+        self.pending_batches.append((items, mode, action_text))
+        self.list_widget.delete(0, tk.END)
+        self.log(f"{reason}，{len(items)} 个项目的批量【{action_text}】已加入队列。", "info")
+        self._update_queue_status()
+
+    def _update_queue_status(self):
+        count = len(self.pending_batches)
+        self.queue_status_label.config(text=f"排队中: {count} 个批量" if count else "")
+
+    def manage_queue(self):
+        if not self.pending_batches:
+            messagebox.showinfo("批量队列", "队列为空。", parent=self)
+            return
+        lines = [f"{i}. 【{action_text}】{len(items)} 个项目" for i, (items, mode, action_text) in enumerate(self.pending_batches, 1)]
+        if messagebox.askyesno("批量队列", "队列中的批量:\n" + "\n".join(lines) + "\n\n是否取消全部排队的批量？", parent=self):
+            count = len(self.pending_batches)
+            self.pending_batches.clear()
+            self._update_queue_status()
+            self.log(f"已取消队列中的 {count} 个批量。", "warning")
+
+    def on_close(self):
+        warnings = []
+        if self.batch_running: warnings.append("有批量操作正在执行，中途退出可能留下临时文件夹。")
+        if self.pending_batches: warnings.append(f"队列中还有 {len(self.pending_batches)} 个批量未执行，退出后将丢失。")
+        if warnings and not messagebox.askyesno("确认退出", "\n".join(warnings) + "\n\n确定要退出吗？", parent=self):
+            return
+        self.destroy()
+
+    def _start_batch(self, items, mode, action_text):
+        self.batch_running = True
         self.set_controls_enabled(False)
         self.config(cursor="watch")
         
         threading.Thread(target=self._execute_batch_worker, args=(items, mode, action_text), daemon=True).start()
 
+    def _in_off_peak_window(self):
+        now = datetime.now().strftime("%H:%M")
+        if self.off_peak_start == self.off_peak_end:
+            return True
+        if self.off_peak_start < self.off_peak_end:
+            return self.off_peak_start <= now < self.off_peak_end
+        return now >= self.off_peak_start or now < self.off_peak_end
+
+    def _check_pending_batches(self):
+        self._start_next_pending_batch()
+        self.after(PENDING_CHECK_INTERVAL_MS, self._check_pending_batches)
+
+    def _start_next_pending_batch(self):
+        scan_running = self.scan_thread and self.scan_thread.is_alive()
+        if not self.pending_batches or self.batch_running or scan_running:
+            return
+        if self.off_peak_enabled and not self._in_off_peak_window():
+            return
+        while self.pending_batches:
+            items, mode, action_text = self.pending_batches.pop(0)
+            self._update_queue_status()
+            # 排队期间目标目录或文件夹可能已变化，开始前重新校验
+            if not self.check_target_base_dir():
+                self.log(f"错误: 目标基目录 '{self.target_base_dir.get()}' 无效，已放弃队列中的批量【{action_text}】。", "error")
+                continue
+            valid_items = []
+            for item in items:
+                error_msg, level = self._check_path(item, mode)
+                if error_msg: self.log(f"跳过: {error_msg}", level)
+                else: valid_items.append(item)
+            if not valid_items:
+                self.log(f"队列中的批量【{action_text}】已没有有效项目，已放弃。", "warning")
+                continue
+            self.log(f"开始执行队列中的批量【{action_text}】({len(valid_items)} 个项目)。", "header")
+            self._start_batch(valid_items, mode, action_text)
+            return
+
     def _execute_batch_worker(self, items, mode, action_text):
+        self._apply_worker_priority()
         success_count, fail_count = 0, 0
-        process_function = self.process_folder_link if mode == "link" else self.process_folder_restore
-        
-        processed_items = set()
-        for item in items:
+        if mode == "relocate":
+            process_function = self.process_folder_relocate
+            matches = self._find_links_under_targets(items)
+            self.log(f"在所选目录下共找到 {len(matches)} 个已链接项目，将迁移到 '{self.target_base_dir.get()}'。", "info")
+            target_counts = Counter(target for target, _ in matches)
+            work_items = []
+            for target, link_path in matches:
+                if target_counts[target] > 1:
+                    self.log(f"警告: '{link_path}' 与其他链接共用目标 '{target}'，已跳过，请手动处理。", "warning")
+                    fail_count += 1
+                else:
+                    work_items.append(link_path)
+        else:
+            process_function = self.process_folder_link if mode == "link" else self.process_folder_restore
+            work_items = items
+
+        for item in work_items:
             if process_function(item):
                 success_count += 1
             else:
                 fail_count += 1
-            processed_items.add(item)
-        
+        processed_items = set(items)
+
         self.after(10, lambda: self.finalize_batch(success_count, fail_count, processed_items, action_text))
 
     def finalize_batch(self, success, fail, processed_items, action_text):
+        self.batch_running = False
         self.config(cursor="")
         self.set_controls_enabled(True)
         
@@ -538,11 +991,12 @@ class FolderLinkerTkinterApp(TkinterDnD.Tk if DND_SUPPORT else tk.Tk):
 
         summary = f"批量【{action_text}】完成。\n成功: {success}\n失败: {fail}"
         self.log(summary, "info")
+        self._start_next_pending_batch()
         messagebox.showinfo("处理结果", summary)
 
     def set_controls_enabled(self, enabled):
         state = tk.NORMAL if enabled else tk.DISABLED
-        for widget in [self.add_button, self.remove_button, self.execute_button, self.change_target_button, self.link_radio, self.restore_radio, self.scan_button, self.add_selected_to_list_button, self.edit_protected_button]:
+        for widget in [self.add_button, self.remove_button, self.execute_button, self.change_target_button, self.link_radio, self.restore_radio, self.relocate_radio, self.scan_button, self.add_selected_to_list_button, self.edit_protected_button]:
             widget.config(state=state)
 
     def _start_scan(self):
@@ -557,6 +1011,7 @@ class FolderLinkerTkinterApp(TkinterDnD.Tk if DND_SUPPORT else tk.Tk):
     def _get_dir_size(self, path):
         total = 0
         try:
+            self.io_throttle.consume()
             for entry in os.scandir(path):
                 if entry.is_file(follow_symlinks=False):
                     total += entry.stat(follow_symlinks=False).st_size
@@ -576,6 +1031,7 @@ class FolderLinkerTkinterApp(TkinterDnD.Tk if DND_SUPPORT else tk.Tk):
         return f"{s} {size_name[i]}"
 
     def _scan_worker(self):
+        self._apply_worker_priority()
         user_profile = os.environ.get('UserProfile')
         if not user_profile:
             self.after(10, lambda: self.log("无法找到用户配置文件目录。", "error"))
@@ -628,6 +1084,10 @@ class FolderLinkerTkinterApp(TkinterDnD.Tk if DND_SUPPORT else tk.Tk):
         editor = ProtectedPathsEditor(self)
         editor.grab_set()
 
+    def open_performance_settings(self):
+        editor = PerformanceSettingsEditor(self)
+        editor.grab_set()
+
 class ProtectedPathsEditor(tk.Toplevel):
     def __init__(self, parent):
         super().__init__(parent)
@@ -707,6 +1167,79 @@ class ProtectedPathsEditor(tk.Toplevel):
         self.parent.log("自定义保护路径已更新。", "success")
         self.destroy()
 
+class PerformanceSettingsEditor(tk.Toplevel):
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.parent = parent
+        self.title("性能设置")
+        self.geometry("460x300")
+
+        self.mb_per_sec_var = tk.StringVar(value=str(self.parent.io_limit_mb_per_sec))
+        self.iops_var = tk.StringVar(value=str(self.parent.io_limit_iops))
+        self.low_priority_var = tk.BooleanVar(value=self.parent.low_priority_workers)
+        self.off_peak_var = tk.BooleanVar(value=self.parent.off_peak_enabled)
+        self.off_peak_start_var = tk.StringVar(value=self.parent.off_peak_start)
+        self.off_peak_end_var = tk.StringVar(value=self.parent.off_peak_end)
+
+        main_frame = ttk.Frame(self, padding=10)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        limit_frame = ttk.LabelFrame(main_frame, text="I/O 限速 (0 表示不限制，执行中修改从下一个文件起生效)", padding=5)
+        limit_frame.pack(fill=tk.X)
+        ttk.Label(limit_frame, text="带宽上限 (MB/s):").grid(row=0, column=0, sticky=tk.W)
+        ttk.Entry(limit_frame, textvariable=self.mb_per_sec_var, width=10).grid(row=0, column=1, sticky=tk.W, padx=5)
+        ttk.Label(limit_frame, text="IOPS 上限:").grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        ttk.Entry(limit_frame, textvariable=self.iops_var, width=10).grid(row=1, column=1, sticky=tk.W, padx=5, pady=(5, 0))
+
+        priority_frame = ttk.LabelFrame(main_frame, text="优先级", padding=5)
+        priority_frame.pack(fill=tk.X, pady=(10, 0))
+        ttk.Checkbutton(priority_frame, text="以低 I/O 与 CPU 优先级运行后台任务", variable=self.low_priority_var).pack(anchor=tk.W)
+
+        schedule_frame = ttk.LabelFrame(main_frame, text="非高峰时段", padding=5)
+        schedule_frame.pack(fill=tk.X, pady=(10, 0))
+        ttk.Checkbutton(schedule_frame, text="批量操作排队至以下时段执行", variable=self.off_peak_var).grid(row=0, column=0, columnspan=4, sticky=tk.W)
+        ttk.Label(schedule_frame, text="开始 (HH:MM):").grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        ttk.Entry(schedule_frame, textvariable=self.off_peak_start_var, width=8).grid(row=1, column=1, sticky=tk.W, padx=5, pady=(5, 0))
+        ttk.Label(schedule_frame, text="结束 (HH:MM):").grid(row=1, column=2, sticky=tk.W, pady=(5, 0))
+        ttk.Entry(schedule_frame, textvariable=self.off_peak_end_var, width=8).grid(row=1, column=3, sticky=tk.W, padx=5, pady=(5, 0))
+
+        buttons_frame = ttk.Frame(main_frame)
+        buttons_frame.pack(fill=tk.X, pady=(10, 0))
+        save_button = ttk.Button(buttons_frame, text="保存并关闭", command=self.save_and_close, style="Accent.TButton")
+        save_button.pack(side=tk.RIGHT)
+        cancel_button = ttk.Button(buttons_frame, text="取消", command=self.destroy)
+        cancel_button.pack(side=tk.RIGHT, padx=5)
+
+    def save_and_close(self):
+        try:
+            mb_per_sec = float(self.mb_per_sec_var.get())
+            iops = int(self.iops_var.get())
+            if mb_per_sec < 0 or iops < 0: raise ValueError
+        except ValueError:
+            messagebox.showerror("输入无效", "带宽和 IOPS 上限必须是非负数。", parent=self)
+            return
+        try:
+            off_peak_start = datetime.strptime(self.off_peak_start_var.get().strip(), "%H:%M").strftime("%H:%M")
+            off_peak_end = datetime.strptime(self.off_peak_end_var.get().strip(), "%H:%M").strftime("%H:%M")
+        except ValueError:
+            messagebox.showerror("输入无效", "时段格式应为 HH:MM，例如 01:00。", parent=self)
+            return
+        if self.off_peak_var.get() and off_peak_start == off_peak_end:
+            messagebox.showerror("输入无效", "非高峰时段的开始和结束时间不能相同。", parent=self)
+            return
+
+        self.parent.io_limit_mb_per_sec = mb_per_sec
+        self.parent.io_limit_iops = iops
+        self.parent.low_priority_workers = self.low_priority_var.get()
+        self.parent.off_peak_enabled = self.off_peak_var.get()
+        self.parent.off_peak_start = off_peak_start
+        self.parent.off_peak_end = off_peak_end
+        self.parent.io_throttle.set_limits(mb_per_sec, iops)
+        self.parent._save_config()
+        self.parent.log("性能设置已更新。", "success")
+        self.parent._start_next_pending_batch()
+        self.destroy()
+
 if __name__ == "__main__":
     app = FolderLinkerTkinterApp()
     app.mainloop()